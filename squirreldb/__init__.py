@@ -8,6 +8,7 @@ from .types import Document, ChangeEvent, Bucket, StorageObject
 from .client import SquirrelDB
 from .cache import Cache
 from .storage import Storage
+from ._json import use_orjson
 from .query import (
     QueryBuilder,
     FieldExpr,
@@ -42,4 +43,5 @@ __all__ = [
     "and_",
     "or_",
     "not_",
+    "use_orjson",
 ]
@@ -0,0 +1,47 @@
+"""JSON codec shared by the client and query builder."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _orjson_dumps(obj: Any) -> str:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        # Values orjson rejects, such as integers past 64 bits
+        return _encode(obj)
+
+
+# The active codec. use_orjson() rebinds these, so callers must look them up
+# on the module (_json.dumps) rather than importing the functions.
+dumps = _encode
+loads = json.loads
+
+
+def use_orjson(enabled: bool = True) -> None:
+    """Opt in to (or out of) orjson for encoding and decoding messages
+
+    orjson is faster but not a drop-in replacement for the stdlib codec:
+    NaN and infinity are encoded as null, and decoded integers outside the
+    64-bit range become floats. Values orjson cannot encode, such as larger
+    integers, are still encoded with the stdlib codec.
+    """
+    global dumps, loads
+    if not enabled:
+        dumps, loads = _encode, json.loads
+    elif orjson is None:
+        raise ImportError("orjson is not installed; install squirreldb[orjson]")
+    else:
+        dumps, loads = _orjson_dumps, orjson.loads
+
+
+def orjson_enabled() -> bool:
+    """Whether orjson has been opted in to"""
+    return dumps is _orjson_dumps
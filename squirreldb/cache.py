@@ -4,76 +4,279 @@ Generated by sdk-generator v0.1.0
 DO NOT EDIT MANUALLY
 """
 
+from __future__ import annotations
+
 import asyncio
-from typing import Optional
+import contextlib
+from collections import deque
+from typing import Any, Optional
+
+NEED_MORE = object()
+"""Returned by RespParser.parse when the buffer holds no complete reply"""
+
+_READ_SIZE = 65536
+_COMPACT_THRESHOLD = 65536
+
+
+# Pre-encoded "*N\r\n" / "$N\r\n" headers for the lengths almost every
+# command uses, so the encoder only formats integers for large arguments.
+_ARRAY_HEADERS = [b"*%d\r\n" % i for i in range(1024)]
+_BULK_HEADERS = [b"$%d\r\n" % i for i in range(1024)]
+
+
+def _encode_command(args: tuple) -> bytearray:
+    count = len(args)
+    buf = bytearray(_ARRAY_HEADERS[count] if count < 1024 else b"*%d\r\n" % count)
+    extend = buf.extend
+    for arg in args:
+        data = arg if isinstance(arg, (bytes, bytearray)) else str(arg).encode()
+        size = len(data)
+        extend(_BULK_HEADERS[size] if size < 1024 else b"$%d\r\n" % size)
+        extend(data)
+        extend(b"\r\n")
+    return buf
+
+
+def encode_resp(*args: str | int | bytes) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    return bytes(_encode_command(args))
+
+
+# Commands without arguments never change, so their frames are built once.
+_PING = encode_resp("PING")
+_DBSIZE = encode_resp("DBSIZE")
+_FLUSHDB = encode_resp("FLUSHDB")
+
+
+def _decode_reply(value: Any) -> Any:
+    if type(value) is bytes:
+        return value.decode()
+    if type(value) is list:
+        return [_decode_reply(item) for item in value]
+    return value
+
+
+class RespParser:
+    """Incremental RESP reply parser
+
+    Bytes are appended with feed() and complete replies are taken with
+    parse(). Bulk strings are returned as bytes; status replies as str.
+    Parsed input is never scanned twice: arrays that span several
+    reads keep their partial items on a stack, and only an incomplete
+    element at the end of the buffer is retried on the next call.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+        self._stack: list[list] = []
+
+    def feed(self, data: bytes) -> None:
+        """Append received bytes to the buffer"""
+        buf = self._buf
+        if self._pos == len(buf):
+            buf.clear()
+            self._pos = 0
+        elif self._pos > _COMPACT_THRESHOLD:
+            del buf[:self._pos]
+            self._pos = 0
+        buf.extend(data)
+
+    def parse(self) -> Any:
+        """Return the next complete reply, or NEED_MORE"""
+        buf = self._buf
+        find = buf.find
+        size = len(buf)
+        stack = self._stack
+        pos = self._pos
+        # The cursor stays local and one view serves every bulk string, so
+        # large array replies cost no per-element attribute writes or views.
+        with memoryview(buf) as view:
+            while True:
+                end = find(b"\r\n", pos)
+                if end == -1:
+                    break
+                prefix = buf[pos]
+                if prefix == 36:  # $
+                    length = int(buf[pos + 1:end])
+                    if length == -1:
+                        value = None
+                        pos = end + 2
+                    else:
+                        stop = end + 2 + length
+                        if stop + 2 > size:
+                            break
+                        value = view[end + 2:stop].tobytes()
+                        pos = stop + 2
+                elif prefix == 42:  # *
+                    count = int(buf[pos + 1:end])
+                    pos = end + 2
+                    if count > 0:
+                        stack.append([[], count])
+                        continue
+                    value = None if count == -1 else []
+                elif prefix == 43:  # +
+                    value = buf[pos + 1:end].decode()
+                    pos = end + 2
+                elif prefix == 58:  # :
+                    value = int(buf[pos + 1:end])
+                    pos = end + 2
+                elif prefix == 45:  # -
+                    value = Exception(buf[pos + 1:end].decode())
+                    pos = end + 2
+                else:
+                    raise ConnectionError(f"Invalid RESP reply prefix: {chr(prefix)!r}")
+
+                while stack:
+                    top = stack[-1]
+                    top[0].append(value)
+                    top[1] -= 1
+                    if top[1]:
+                        break
+                    value = stack.pop()[0]
+                else:
+                    self._pos = pos
+                    return value
+        self._pos = pos
+        return NEED_MORE
 
 
 class Cache:
     """Redis-compatible cache client using RESP protocol"""
 
-    def __init__(self, host: str = "localhost", port: int = 6379):
+    def __init__(
+        self, host: str = "localhost", port: int = 6379, decode_responses: bool = True
+    ):
         self._host = host
         self._port = port
+        self._decode_responses = decode_responses
         self._reader: Optional[asyncio.StreamReader] = None
         self._writer: Optional[asyncio.StreamWriter] = None
+        self._parser = RespParser()
+        self._pending: deque[asyncio.Future] = deque()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._write_high_water = 0
 
     @classmethod
-    async def connect(cls, host: str = "localhost", port: int = 6379) -> "Cache":
+    async def connect(
+        cls, host: str = "localhost", port: int = 6379, decode_responses: bool = True
+    ) -> "Cache":
         """Connect to cache server"""
-        cache = cls(host, port)
+        cache = cls(host, port, decode_responses)
         await cache._connect()
         return cache
 
     async def _connect(self) -> None:
+        self._loop = asyncio.get_running_loop()
         self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        self._write_high_water = self._writer.transport.get_write_buffer_limits()[1]
+        self._reader_task = asyncio.create_task(self._read_loop())
 
     async def close(self) -> None:
         """Close the connection"""
+        if self._reader_task:
+            self._reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader_task
         if self._writer:
             self._writer.close()
             await self._writer.wait_closed()
 
-    def _encode(self, *args: str | int) -> bytes:
-        parts = [f"*{len(args)}\r\n"]
-        for arg in args:
-            s = str(arg)
-            parts.append(f"${len(s)}\r\n{s}\r\n")
-        return "".join(parts).encode()
+    async def _read_loop(self) -> None:
+        # Replies arrive in request order, so each one resolves the oldest
+        # pending future. Futures whose caller was cancelled are still popped
+        # to keep the queue aligned with the reply stream.
+        parser = self._parser
+        pending = self._pending
+        error = ConnectionError("Connection closed")
+        try:
+            while True:
+                data = await self._reader.read(_READ_SIZE)
+                if not data:
+                    break
+                parser.feed(data)
+                while (reply := parser.parse()) is not NEED_MORE:
+                    if not pending:
+                        continue
+                    future = pending.popleft()
+                    if future.done():
+                        continue
+                    if isinstance(reply, Exception):
+                        future.set_exception(reply)
+                    else:
+                        future.set_result(reply)
+        except ConnectionError as e:
+            error = e
+        finally:
+            while pending:
+                future = pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+    def _command(self, *args: str | int | bytes):
+        return self._execute(_encode_command(args))
+
+    async def _execute(self, frame: bytes | bytearray):
+        # No lock is needed for concurrent callers: queueing the future and
+        # writing the command happen with no await in between, so the event
+        # loop keeps the pending queue in the same order as the bytes written.
+        # Writes are not drained one by one, so bursts coalesce in the
+        # transport buffer; callers only wait for the socket once that buffer
+        # is past its high-water mark. If sending fails the future is
+        # cancelled rather than removed, which keeps the queue aligned and
+        # leaves no unretrieved exception behind.
+        if self._reader_task is None or self._reader_task.done():
+            raise ConnectionError("Connection closed")
+        future = self._loop.create_future()
+        self._pending.append(future)
+        writer = self._writer
+        try:
+            writer.write(frame)
+            if writer.transport.get_write_buffer_size() > self._write_high_water:
+                await writer.drain()
+        except BaseException:
+            future.cancel()
+            raise
+        return await future
+
+    async def pipeline(self, commands: list[tuple]) -> list:
+        """Send several commands at once and return their replies in order
 
-    async def _read_response(self):
-        line = await self._reader.readline()
-        if not line:
+        The encoded commands are handed to the transport in one writelines
+        call, which sends them with a single vectored write where supported.
+        Bulk replies, including those nested in arrays, are decoded to str
+        when decode_responses is set. Raises the first error reply after all
+        replies have arrived.
+        """
+        if self._reader_task is None or self._reader_task.done():
             raise ConnectionError("Connection closed")
+        create_future = self._loop.create_future
+        futures = [create_future() for _ in commands]
+        self._pending.extend(futures)
+        writer = self._writer
+        try:
+            writer.writelines([_encode_command(args) for args in commands])
+            if writer.transport.get_write_buffer_size() > self._write_high_water:
+                await writer.drain()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        if self._decode_responses:
+            return [_decode_reply(result) for result in results]
+        return results
 
-        prefix = chr(line[0])
-        data = line[1:].decode().strip()
-
-        if prefix == "+":
-            return data
-        elif prefix == "-":
-            raise Exception(data)
-        elif prefix == ":":
-            return int(data)
-        elif prefix == "$":
-            length = int(data)
-            if length == -1:
-                return None
-            value = await self._reader.read(length + 2)
-            return value[:-2].decode()
-        elif prefix == "*":
-            count = int(data)
-            if count == -1:
-                return None
-            return [await self._read_response() for _ in range(count)]
-
-    async def _command(self, *args: str | int):
-        self._writer.write(self._encode(*args))
-        await self._writer.drain()
-        return await self._read_response()
-
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[str | bytes]:
         """Get a value"""
-        return await self._command("GET", key)
+        value = await self._command("GET", key)
+        if value is not None and self._decode_responses:
+            return value.decode()
+        return value
 
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
         """Set a value"""
@@ -106,9 +309,12 @@ class Cache:
         """Decrement by amount"""
         return await self._command("DECRBY", key, amount)
 
-    async def mget(self, *keys: str) -> list[Optional[str]]:
+    async def mget(self, *keys: str) -> list[Optional[str | bytes]]:
         """Get multiple values"""
-        return await self._command("MGET", *keys)
+        values = await self._command("MGET", *keys)
+        if self._decode_responses:
+            return [None if v is None else v.decode() for v in values]
+        return values
 
     async def mset(self, entries: dict[str, str]) -> None:
         """Set multiple values"""
@@ -117,9 +323,12 @@ class Cache:
             args.extend([k, v])
         await self._command(*args)
 
-    async def keys(self, pattern: str) -> list[str]:
+    async def keys(self, pattern: str) -> list[str | bytes]:
         """Find keys matching pattern"""
-        return await self._command("KEYS", pattern)
+        keys = await self._command("KEYS", pattern)
+        if self._decode_responses:
+            return [k.decode() for k in keys]
+        return keys
 
     async def expire(self, key: str, seconds: int) -> bool:
         """Set key expiration"""
@@ -135,16 +344,16 @@ class Cache:
 
     async def dbsize(self) -> int:
         """Get number of keys"""
-        return await self._command("DBSIZE")
+        return await self._execute(_DBSIZE)
 
     async def flushdb(self) -> None:
         """Delete all keys"""
-        await self._command("FLUSHDB")
+        await self._execute(_FLUSHDB)
 
     async def info(self) -> str:
         """Get server info"""
-        return await self._command("INFO")
+        return (await self._command("INFO")).decode()
 
     async def ping(self) -> str:
         """Ping the server"""
-        return await self._command("PING")
+        return await self._execute(_PING)
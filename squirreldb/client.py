@@ -5,21 +5,40 @@ DO NOT EDIT MANUALLY
 """
 
 import asyncio
-import json
-import uuid
 from typing import Any, Callable, Optional
 from websockets import connect as ws_connect
 
+from . import _json
 from .types import Document, ChangeEvent
 
 
+def _request_prefix(msg_type: str) -> str:
+    return '{"type":%s,"id":' % _json.dumps(msg_type)
+
+
+# Requests are spliced from a pre-encoded type/id prefix and the encoded
+# request fields, so only caller-supplied values go through the encoder.
+_PING_MESSAGE = _json.dumps({"type": "Ping"})
+_LIST_COLLECTIONS = _request_prefix("ListCollections")
+_QUERY = _request_prefix("Query")
+_INSERT = _request_prefix("Insert")
+_UPDATE = _request_prefix("Update")
+_DELETE = _request_prefix("Delete")
+_SUBSCRIBE = _request_prefix("Subscribe")
+_UNSUBSCRIBE = _request_prefix("Unsubscribe")
+
+_RESPONSE_TYPES = frozenset({"Result", "Error", "Subscribed", "Unsubscribed", "Collections"})
+
+
 class SquirrelDB:
     """SquirrelDB WebSocket client"""
 
     def __init__(self, url: str):
         self._url = url if url.startswith("ws://") or url.startswith("wss://") else f"ws://{url}"
         self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._pending: dict[str, asyncio.Future] = {}
+        self._request_id = 0
         self._subscriptions: dict[str, Callable[[ChangeEvent], None]] = {}
         self._listener_task: Optional[asyncio.Task] = None
 
@@ -31,43 +50,57 @@ class SquirrelDB:
         return client
 
     async def _connect(self) -> None:
+        self._loop = asyncio.get_running_loop()
         self._ws = await ws_connect(self._url)
         self._listener_task = asyncio.create_task(self._listen())
 
     async def _listen(self) -> None:
         try:
             async for message in self._ws:
-                await self._handle_message(json.loads(message))
+                self._handle_message(_json.loads(message))
         except Exception:
             pass
-
-    async def _handle_message(self, msg: dict) -> None:
+        finally:
+            self._handle_disconnect()
+
+    def _handle_disconnect(self) -> None:
+        # One shared error for every waiter; swapping the dict first keeps
+        # late responses from touching futures that were already rejected.
+        error = ConnectionError("Connection closed")
+        pending = self._pending
+        self._pending = {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _handle_message(self, msg: dict) -> None:
         msg_type = msg.get("type")
 
-        if msg_type == "Pong":
-            return
+        # Change events dominate subscription traffic, so they are matched
+        # first and need a single subscription lookup.
+        if msg_type == "Change":
+            callback = self._subscriptions.get(msg.get("subscription_id"))
+            if callback is not None:
+                callback(ChangeEvent.from_dict(msg.get("change", {})))
 
-        if msg_type in ("Result", "Error", "Subscribed", "Unsubscribed", "Collections"):
-            msg_id = msg.get("id")
-            if msg_id and msg_id in self._pending:
-                future = self._pending.pop(msg_id)
+        elif msg_type in _RESPONSE_TYPES:
+            future = self._pending.pop(msg.get("id"), None)
+            if future is not None and not future.done():
                 if msg_type == "Error":
                     future.set_exception(Exception(msg.get("message", "Unknown error")))
                 else:
                     future.set_result(msg)
 
-        elif msg_type == "Change":
-            sub_id = msg.get("subscription_id")
-            if sub_id and sub_id in self._subscriptions:
-                change = ChangeEvent.from_dict(msg.get("change", {}))
-                self._subscriptions[sub_id](change)
-
-    async def _send(self, msg: dict) -> dict:
-        msg_id = str(uuid.uuid4())
-        msg["id"] = msg_id
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
+    async def _send(self, prefix: str, fields: Optional[dict] = None) -> dict:
+        self._request_id += 1
+        msg_id = str(self._request_id)
+        if fields:
+            message = f'{prefix}"{msg_id}",{_json.dumps(fields)[1:]}'
+        else:
+            message = f'{prefix}"{msg_id}"}}'
+        future: asyncio.Future = self._loop.create_future()
         self._pending[msg_id] = future
-        await self._ws.send(json.dumps(msg))
+        await self._ws.send(message)
         return await future
 
     async def close(self) -> None:
@@ -79,28 +112,27 @@ class SquirrelDB:
 
     async def ping(self) -> None:
         """Ping the server"""
-        await self._ws.send(json.dumps({"type": "Ping"}))
+        await self._ws.send(_PING_MESSAGE)
 
     async def list_collections(self) -> list[str]:
         """List all collections"""
-        result = await self._send({"type": "ListCollections"})
+        result = await self._send(_LIST_COLLECTIONS)
         return result.get("collections", [])
 
     async def query(self, query: str) -> list[Document]:
         """Execute a query"""
-        result = await self._send({"type": "Query", "query": query})
-        return [Document.from_dict(d) for d in result.get("documents", [])]
+        result = await self._send(_QUERY, {"query": query})
+        return Document.from_dict_list(result.get("documents", []))
 
     async def insert(self, collection: str, data: dict[str, Any]) -> Document:
         """Insert a document"""
-        result = await self._send({"type": "Insert", "collection": collection, "data": data})
+        result = await self._send(_INSERT, {"collection": collection, "data": data})
         docs = result.get("documents", [])
         return Document.from_dict(docs[0]) if docs else None
 
     async def update(self, collection: str, doc_id: str, data: dict[str, Any]) -> Document:
         """Update a document"""
-        result = await self._send({
-            "type": "Update",
+        result = await self._send(_UPDATE, {
             "collection": collection,
             "document_id": doc_id,
             "data": data,
@@ -110,8 +142,7 @@ class SquirrelDB:
 
     async def delete(self, collection: str, doc_id: str) -> Document:
         """Delete a document"""
-        result = await self._send({
-            "type": "Delete",
+        result = await self._send(_DELETE, {
             "collection": collection,
             "document_id": doc_id,
         })
@@ -122,12 +153,12 @@ class SquirrelDB:
         self, query: str, callback: Callable[[ChangeEvent], None]
     ) -> str:
         """Subscribe to changes"""
-        result = await self._send({"type": "Subscribe", "query": query})
+        result = await self._send(_SUBSCRIBE, {"query": query})
         sub_id = result.get("subscription_id")
         self._subscriptions[sub_id] = callback
         return sub_id
 
     async def unsubscribe(self, subscription_id: str) -> None:
         """Unsubscribe from changes"""
-        await self._send({"type": "Unsubscribe", "subscription_id": subscription_id})
+        await self._send(_UNSUBSCRIBE, {"subscription_id": subscription_id})
         self._subscriptions.pop(subscription_id, None)
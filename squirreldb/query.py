@@ -5,17 +5,40 @@ DO NOT EDIT MANUALLY
 """
 
 from __future__ import annotations
+from collections import defaultdict
 from dataclasses import dataclass, field as dataclass_field
+from functools import lru_cache
 from typing import Any, Callable, Literal, TypedDict
-import json
+import sys
+
+from . import _json
 
 
 SortDirection = Literal["asc", "desc"]
 
+# Operator names are interned once, so every condition shares one string and
+# filter-dict lookups on them compare by identity.
+_OP_EQ = sys.intern("$eq")
+_OP_NE = sys.intern("$ne")
+_OP_GT = sys.intern("$gt")
+_OP_GTE = sys.intern("$gte")
+_OP_LT = sys.intern("$lt")
+_OP_LTE = sys.intern("$lte")
+_OP_IN = sys.intern("$in")
+_OP_NIN = sys.intern("$nin")
+_OP_CONTAINS = sys.intern("$contains")
+_OP_STARTS_WITH = sys.intern("$startsWith")
+_OP_ENDS_WITH = sys.intern("$endsWith")
+_OP_EXISTS = sys.intern("$exists")
+_OP_AND = sys.intern("$and")
+_OP_OR = sys.intern("$or")
+_OP_NOT = sys.intern("$not")
+
 
 @dataclass
 class FilterCondition:
     """A single filter condition."""
+    __slots__ = ("field", "operator", "value")
     field: str
     operator: str
     value: Any
@@ -24,6 +47,7 @@ class FilterCondition:
 @dataclass
 class SortSpec:
     """Sort specification for a field."""
+    __slots__ = ("field", "direction")
     field: str
     direction: SortDirection
 
@@ -46,75 +70,97 @@ class StructuredQuery(TypedDict, total=False):
 class FieldExpr:
     """Field expression for building filter conditions."""
 
+    __slots__ = ("_field_name",)
+
     def __init__(self, field_name: str) -> None:
-        self._field_name = field_name
+        # Interned so filter-dict merges on the same field compare by identity.
+        self._field_name = sys.intern(field_name)
 
     def eq(self, value: Any) -> FilterCondition:
         """Equal to."""
-        return FilterCondition(self._field_name, "$eq", value)
+        return FilterCondition(self._field_name, _OP_EQ, value)
 
     def ne(self, value: Any) -> FilterCondition:
         """Not equal to."""
-        return FilterCondition(self._field_name, "$ne", value)
+        return FilterCondition(self._field_name, _OP_NE, value)
 
     def gt(self, value: Any) -> FilterCondition:
         """Greater than."""
-        return FilterCondition(self._field_name, "$gt", value)
+        return FilterCondition(self._field_name, _OP_GT, value)
 
     def gte(self, value: Any) -> FilterCondition:
         """Greater than or equal to."""
-        return FilterCondition(self._field_name, "$gte", value)
+        return FilterCondition(self._field_name, _OP_GTE, value)
 
     def lt(self, value: Any) -> FilterCondition:
         """Less than."""
-        return FilterCondition(self._field_name, "$lt", value)
+        return FilterCondition(self._field_name, _OP_LT, value)
 
     def lte(self, value: Any) -> FilterCondition:
         """Less than or equal to."""
-        return FilterCondition(self._field_name, "$lte", value)
+        return FilterCondition(self._field_name, _OP_LTE, value)
 
     def is_in(self, values: list[Any]) -> FilterCondition:
         """Value in array."""
-        return FilterCondition(self._field_name, "$in", values)
+        return FilterCondition(self._field_name, _OP_IN, list(values))
 
     def not_in(self, values: list[Any]) -> FilterCondition:
         """Value not in array."""
-        return FilterCondition(self._field_name, "$nin", values)
+        return FilterCondition(self._field_name, _OP_NIN, list(values))
 
     def contains(self, value: str) -> FilterCondition:
         """String contains substring."""
-        return FilterCondition(self._field_name, "$contains", value)
+        return FilterCondition(self._field_name, _OP_CONTAINS, value)
 
     def starts_with(self, value: str) -> FilterCondition:
         """String starts with prefix."""
-        return FilterCondition(self._field_name, "$startsWith", value)
+        return FilterCondition(self._field_name, _OP_STARTS_WITH, value)
 
     def ends_with(self, value: str) -> FilterCondition:
         """String ends with suffix."""
-        return FilterCondition(self._field_name, "$endsWith", value)
+        return FilterCondition(self._field_name, _OP_ENDS_WITH, value)
 
     def exists(self, value: bool = True) -> FilterCondition:
         """Field exists (or not)."""
-        return FilterCondition(self._field_name, "$exists", value)
+        return FilterCondition(self._field_name, _OP_EXISTS, value)
+
+
+@lru_cache(maxsize=1024)
+def _cached_field_expr(name: str) -> FieldExpr:
+    # Bounded, so queries over dynamic field names cannot grow it forever
+    return FieldExpr(name)
 
 
 class DocProxy:
     """Document proxy for fluent field access."""
 
     def __getattr__(self, name: str) -> FieldExpr:
-        return FieldExpr(name)
+        # FieldExpr only holds its name, so one instance per field is shared
+        # across proxies instead of being allocated on every access.
+        return _cached_field_expr(name)
 
 
 class QueryBuilder:
     """Query builder for constructing SquirrelDB queries."""
 
+    __slots__ = (
+        "_table_name",
+        "_filter",
+        "_sorts",
+        "_limit_value",
+        "_skip_value",
+        "_changes_opts",
+        "_compiled",
+    )
+
     def __init__(self, table_name: str) -> None:
         self._table_name = table_name
-        self._filters: list[FilterCondition] = []
-        self._sorts: list[SortSpec] = []
+        self._filter: defaultdict[str, Any] = defaultdict(dict)
+        self._sorts: list[SortSpec] | None = None
         self._limit_value: int | None = None
         self._skip_value: int | None = None
         self._changes_opts: ChangesOptions | None = None
+        self._compiled: str | None = None
 
     def find(
         self,
@@ -123,32 +169,47 @@ class QueryBuilder:
         | Callable[[DocProxy], FilterCondition | list[FilterCondition]],
     ) -> QueryBuilder:
         """Add filter conditions using callback or object."""
+        self._compiled = None
+        if type(condition) is FilterCondition:
+            self._add_filter(condition)
+            return self
         if callable(condition):
-            result = condition(DocProxy())
-            if isinstance(result, list):
-                self._filters.extend(result)
-            else:
-                self._filters.append(result)
-        elif isinstance(condition, list):
-            self._filters.extend(condition)
+            condition = condition(DocProxy())
+        if isinstance(condition, list):
+            for cond in condition:
+                self._add_filter(cond)
         else:
-            self._filters.append(condition)
+            self._add_filter(condition)
         return self
 
+    def _add_filter(self, cond: FilterCondition) -> None:
+        # Field conditions are merged into the wire-format filter as they
+        # arrive. Logical conditions are kept as-is and converted on compile,
+        # so each compiled query gets operand lists of its own.
+        if cond.operator in _LOGICAL_HANDLERS:
+            self._filter[cond.operator] = cond
+            return
+        self._filter[cond.field][cond.operator] = cond.value
+
     def sort(
         self, field_name: str, direction: SortDirection = "asc"
     ) -> QueryBuilder:
         """Add sort specification."""
+        self._compiled = None
+        if self._sorts is None:
+            self._sorts = []
         self._sorts.append(SortSpec(field_name, direction))
         return self
 
     def limit(self, n: int) -> QueryBuilder:
         """Set maximum number of results."""
+        self._compiled = None
         self._limit_value = n
         return self
 
     def skip(self, n: int) -> QueryBuilder:
         """Set number of results to skip."""
+        self._compiled = None
         self._skip_value = n
         return self
 
@@ -156,15 +217,23 @@ class QueryBuilder:
         self, options: ChangesOptions | None = None
     ) -> QueryBuilder:
         """Subscribe to changes."""
-        self._changes_opts = options or {"include_initial": True}
+        self._compiled = None
+        self._changes_opts = dict(options) if options else {"include_initial": True}
         return self
 
     def compile_structured(self) -> StructuredQuery:
         """Compile to structured query object."""
         query: StructuredQuery = {"table": self._table_name}
 
-        if self._filters:
-            query["filter"] = self._build_filter_object()
+        if self._filter:
+            query["filter"] = {
+                f: (
+                    _LOGICAL_HANDLERS[f](ops.value)
+                    if type(ops) is FilterCondition
+                    else {op: _copy_operand(v) for op, v in ops.items()}
+                )
+                for f, ops in self._filter.items()
+            }
 
         if self._sorts:
             query["sort"] = [
@@ -179,21 +248,63 @@ class QueryBuilder:
             query["skip"] = self._skip_value
 
         if self._changes_opts is not None:
-            query["changes"] = self._changes_opts
+            query["changes"] = dict(self._changes_opts)
 
         return query
 
     def compile(self) -> str:
-        """Compile to JSON string."""
-        return json.dumps(self.compile_structured())
+        """Compile to JSON string.
+
+        The result is cached until the builder is next modified. is_in/not_in
+        lists and changes() options are copied when passed in; other mutable
+        values must not be changed after being passed to the builder.
+        """
+        if self._compiled is None:
+            if not self._filter and self._sorts is None and self._changes_opts is None:
+                self._compiled = self._compile_scalars()
+            else:
+                self._compiled = _json.dumps(self.compile_structured())
+        return self._compiled
+
+    def _compile_scalars(self) -> str:
+        # Table/limit/skip-only queries are formatted directly; the stdlib
+        # encoder's per-call setup dominates for a dict this small.
+        text = '{"table":' + _json.dumps(self._table_name)
+        if self._limit_value is not None:
+            text += ',"limit":' + _scalar_json(self._limit_value)
+        if self._skip_value is not None:
+            text += ',"skip":' + _scalar_json(self._skip_value)
+        return text + "}"
+
+
+def _scalar_json(value: Any) -> str:
+    return str(value) if type(value) is int else _json.dumps(value)
+
+
+def _copy_operand(value: Any) -> Any:
+    # $in/$nin lists are copied so callers mutating a compiled query cannot
+    # reach back into the builder.
+    return list(value) if type(value) is list else value
+
+
+def _condition_to_filter(cond: FilterCondition) -> dict[str, Any]:
+    handler = _LOGICAL_HANDLERS.get(cond.operator)
+    if handler is not None:
+        return {cond.operator: handler(cond.value)}
+    return {cond.field: {cond.operator: _copy_operand(cond.value)}}
+
+
+def _conditions_to_filters(conds: list[FilterCondition]) -> list[dict[str, Any]]:
+    return [_condition_to_filter(c) for c in conds]
+
 
-    def _build_filter_object(self) -> dict[str, Any]:
-        filter_obj: dict[str, dict[str, Any]] = {}
-        for cond in self._filters:
-            if cond.field not in filter_obj:
-                filter_obj[cond.field] = {}
-            filter_obj[cond.field][cond.operator] = cond.value
-        return filter_obj
+# Logical operators, keyed by operator, mapped to the converter for their
+# operand(s); field operators are stored as-is.
+_LOGICAL_HANDLERS: dict[str, Callable[[Any], Any]] = {
+    _OP_AND: _conditions_to_filters,
+    _OP_OR: _conditions_to_filters,
+    _OP_NOT: _condition_to_filter,
+}
 
 
 def table(name: str) -> QueryBuilder:
@@ -208,14 +319,14 @@ def field_expr(name: str) -> FieldExpr:
 
 def and_(*conditions: FilterCondition) -> FilterCondition:
     """Combine conditions with AND."""
-    return FilterCondition("$and", "$and", list(conditions))
+    return FilterCondition(_OP_AND, _OP_AND, list(conditions))
 
 
 def or_(*conditions: FilterCondition) -> FilterCondition:
     """Combine conditions with OR."""
-    return FilterCondition("$or", "$or", list(conditions))
+    return FilterCondition(_OP_OR, _OP_OR, list(conditions))
 
 
 def not_(condition: FilterCondition) -> FilterCondition:
     """Negate a condition."""
-    return FilterCondition("$not", "$not", condition)
+    return FilterCondition(_OP_NOT, _OP_NOT, condition)
@@ -4,11 +4,17 @@ Generated by sdk-generator v0.1.0
 DO NOT EDIT MANUALLY
 """
 
+import base64
+import http.client
+import io
 import re
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
-import urllib.request
-import urllib.error
+from typing import BinaryIO, Iterator, Optional, Union
+from urllib.error import URLError
+from urllib.parse import quote, unquote, urlencode, urlsplit
+from urllib.request import getproxies, proxy_bypass
+import xml.parsers.expat
 
 
 @dataclass
@@ -33,8 +39,86 @@ class StorageError(Exception):
         super().__init__(f"Storage error {status}: {message}")
 
 
+_BUCKET_NAME_RE = re.compile(rb"<Name>([^<]+)</Name>")
+_UNSAFE_PATH_RE = re.compile(r"[^A-Za-z0-9/_.~-]")
+
+
+def _quote_path(path: str) -> str:
+    """Percent-encode a key for use in a request path"""
+    # Most keys need no escaping; one regex scan is far cheaper than quote().
+    if _UNSAFE_PATH_RE.search(path) is None:
+        return path
+    return quote(path, safe="/")
+
+
+def _stream_length(stream: BinaryIO) -> Optional[int]:
+    """Bytes remaining in a seekable stream, or None if it cannot seek"""
+    try:
+        pos = stream.tell()
+        end = stream.seek(0, io.SEEK_END)
+        stream.seek(pos)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - pos
+
+
+def _stream_position(stream: BinaryIO) -> Optional[int]:
+    """Current offset of a seekable stream, or None if it cannot seek"""
+    try:
+        return stream.tell() if stream.seekable() else None
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class _ObjectListParser:
+    """Streaming parser for ListObjects responses
+
+    Objects are emitted as each <Contents> element closes, so the response
+    body is parsed in chunks straight from the socket and never held whole.
+    """
+
+    _FIELDS = frozenset({"Key", "Size", "ETag", "LastModified"})
+
+    def __init__(self) -> None:
+        self.objects: list[StorageObject] = []
+        self._current: Optional[dict[str, str]] = None
+        self._text: list[str] = []
+        self._parser = xml.parsers.expat.ParserCreate()
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._text.append
+
+    def parse(self, stream: BinaryIO) -> list[StorageObject]:
+        self._parser.ParseFile(stream)
+        return self.objects
+
+    def _start(self, name: str, attrs: dict) -> None:
+        if name == "Contents":
+            self._current = {}
+        self._text.clear()
+
+    def _end(self, name: str) -> None:
+        current = self._current
+        if current is None:
+            return
+        if name in self._FIELDS:
+            current[name] = "".join(self._text)
+        elif name == "Contents":
+            self.objects.append(StorageObject(
+                key=current.get("Key", ""),
+                size=int(current.get("Size", 0)),
+                etag=current.get("ETag", "").strip('"'),
+                last_modified=current.get("LastModified", ""),
+            ))
+            self._current = None
+
+
 class Storage:
-    """S3-compatible storage client"""
+    """S3-compatible storage client
+
+    Like urllib, the client honours the http_proxy/https_proxy/no_proxy
+    environment, and raises URLError when the endpoint cannot be reached.
+    """
 
     def __init__(
         self,
@@ -42,11 +126,29 @@ class Storage:
         access_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         region: str = "us-east-1",
+        max_conns: int = 64,
     ):
         self._endpoint = endpoint.rstrip("/")
         self._access_key = access_key
         self._secret_key = secret_key
         self._region = region
+        # Headers sent on every request; http.client only reads the mapping,
+        # so requests without headers of their own share this dict as-is.
+        self._default_headers: dict[str, str] = (
+            {"x-amz-access-key-id": access_key} if access_key else {}
+        )
+        url = urlsplit(self._endpoint)
+        self._conn_class = (
+            http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        )
+        self._netloc = url.netloc
+        self._base_path = url.path
+        self._tunnel: Optional[tuple[str, dict[str, str]]] = None
+        proxy = None if proxy_bypass(url.hostname or "") else getproxies().get(url.scheme)
+        if proxy:
+            self._use_proxy(url.scheme, proxy)
+        self._max_conns = max_conns
+        self._idle: list[http.client.HTTPConnection] = []
 
     @classmethod
     def connect(
@@ -55,37 +157,141 @@ class Storage:
         access_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         region: str = "us-east-1",
+        max_conns: int = 64,
     ) -> "Storage":
         """Create a new storage client"""
-        return cls(endpoint, access_key, secret_key, region)
+        return cls(endpoint, access_key, secret_key, region, max_conns)
+
+    def _use_proxy(self, scheme: str, proxy: str) -> None:
+        proxy_url = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        auth = {}
+        if proxy_url.username is not None:
+            credentials = f"{unquote(proxy_url.username)}:{unquote(proxy_url.password or '')}"
+            auth["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode()
+        target = self._netloc
+        self._netloc = proxy_url.hostname or ""
+        if proxy_url.port is not None:
+            self._netloc += f":{proxy_url.port}"
+        if scheme == "https":
+            # TLS to the endpoint runs through a CONNECT tunnel
+            self._tunnel = (target, auth)
+        else:
+            # Plain HTTP proxies take the absolute URL in the request line
+            self._base_path = f"http://{target}{self._base_path}"
+            self._default_headers = {**self._default_headers, **auth}
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        while True:
+            try:
+                conn = self._idle.pop()
+            except IndexError:
+                return
+            conn.close()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        conn = self._conn_class(self._netloc)
+        if self._tunnel is not None:
+            conn.set_tunnel(self._tunnel[0], headers=self._tunnel[1])
+        return conn
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        if len(self._idle) < self._max_conns:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        body: Union[bytes, BinaryIO, None],
+        headers: dict[str, str],
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        # A pooled connection may have been closed by the server while idle, so
+        # the request is retried once on a fresh connection. Stream bodies are
+        # rewound for the retry; ones that cannot seek skip the pool instead.
+        is_stream = body is not None and not isinstance(body, (bytes, bytearray, memoryview))
+        start = _stream_position(body) if is_stream else None
+        conn = None
+        if not is_stream or start is not None:
+            # pop() rather than check-then-pop, so threads sharing the client
+            # cannot race for the last idle connection.
+            try:
+                conn = self._idle.pop()
+            except IndexError:
+                pass
+        if conn is not None:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if is_stream:
+                    body.seek(start)
+        conn = self._new_connection()
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+            except OSError as e:
+                # Same exception urlopen() raised for unreachable endpoints
+                raise URLError(e) from e
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    @contextmanager
+    def _open(
+        self,
+        method: str,
+        path: str,
+        body: Union[bytes, BinaryIO, None] = None,
+        headers: Optional[dict[str, str]] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        req_headers = {**headers, **self._default_headers} if headers else self._default_headers
+        conn, response = self._send(method, f"{self._base_path}{path}", body, req_headers)
+        try:
+            if response.status >= 400:
+                raise StorageError(response.status, response.read().decode())
+            yield response
+        finally:
+            # Connections go back to the pool only once their response has
+            # been fully read; anything else would desync the next request.
+            if response.isclosed():
+                self._release(conn)
+            else:
+                conn.close()
 
     def _request(
         self,
         method: str,
         path: str,
-        body: Optional[bytes] = None,
+        body: Union[bytes, BinaryIO, None] = None,
         headers: Optional[dict[str, str]] = None,
     ) -> tuple[int, bytes, dict[str, str]]:
-        url = f"{self._endpoint}{path}"
-        req_headers = headers or {}
-
-        if self._access_key:
-            req_headers["x-amz-access-key-id"] = self._access_key
-
-        req = urllib.request.Request(url, data=body, headers=req_headers, method=method)
+        with self._open(method, path, body, headers) as response:
+            resp_headers = {k.lower(): v for k, v in response.headers.items()}
+            return response.status, response.read(), resp_headers
 
-        try:
-            with urllib.request.urlopen(req) as response:
-                return response.status, response.read(), dict(response.headers)
-        except urllib.error.HTTPError as e:
-            raise StorageError(e.code, e.read().decode())
+    def _exists(self, path: str) -> bool:
+        # HEAD carries no body, so the status alone answers the check without
+        # building and catching a StorageError for every miss.
+        conn, response = self._send(
+            "HEAD", f"{self._base_path}{path}", None, self._default_headers
+        )
+        response.read()
+        if response.isclosed():
+            self._release(conn)
+        else:
+            conn.close()
+        return response.status < 400
 
     def list_buckets(self) -> list[Bucket]:
         """List all buckets"""
         _, body, _ = self._request("GET", "/")
-        text = body.decode()
-        matches = re.findall(r"<Name>([^<]+)</Name>", text)
-        return [Bucket(name=m, created_at="") for m in matches]
+        # Scan the raw body and decode only the matched names
+        return [Bucket(name=m.decode(), created_at="") for m in _BUCKET_NAME_RE.findall(body)]
 
     def create_bucket(self, name: str) -> None:
         """Create a bucket"""
@@ -97,62 +303,53 @@ class Storage:
 
     def bucket_exists(self, name: str) -> bool:
         """Check if bucket exists"""
-        try:
-            self._request("HEAD", f"/{name}")
-            return True
-        except StorageError:
-            return False
+        return self._exists(f"/{name}")
 
     def list_objects(
         self, bucket: str, prefix: Optional[str] = None, max_keys: Optional[int] = None
     ) -> list[StorageObject]:
         """List objects in bucket"""
-        params = []
+        params = {}
         if prefix:
-            params.append(f"prefix={prefix}")
+            params["prefix"] = prefix
         if max_keys:
-            params.append(f"max-keys={max_keys}")
-        query = f"?{'&'.join(params)}" if params else ""
-
-        _, body, _ = self._request("GET", f"/{bucket}{query}")
-        text = body.decode()
-        matches = re.findall(
-            r"<Key>([^<]+)</Key>.*?<Size>(\d+)</Size>.*?<ETag>([^<]+)</ETag>",
-            text,
-            re.DOTALL,
-        )
-        return [
-            StorageObject(key=m[0], size=int(m[1]), etag=m[2].strip('"'), last_modified="")
-            for m in matches
-        ]
+            params["max-keys"] = max_keys
+        query = f"?{urlencode(params, quote_via=quote)}" if params else ""
+
+        with self._open("GET", f"/{bucket}{query}") as response:
+            return _ObjectListParser().parse(response)
 
     def get_object(self, bucket: str, key: str) -> bytes:
         """Get object content"""
-        _, body, _ = self._request("GET", f"/{bucket}/{key}")
+        _, body, _ = self._request("GET", f"/{bucket}/{_quote_path(key)}")
         return body
 
     def put_object(
         self,
         bucket: str,
         key: str,
-        data: bytes,
+        data: Union[bytes, BinaryIO],
         content_type: Optional[str] = None,
     ) -> str:
-        """Upload object"""
+        """Upload object
+
+        File-like data is streamed from its current position rather than
+        read into memory first.
+        """
         headers = {}
         if content_type:
             headers["content-type"] = content_type
-        _, _, resp_headers = self._request("PUT", f"/{bucket}/{key}", data, headers)
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            length = _stream_length(data)
+            if length is not None:
+                headers["content-length"] = str(length)
+        _, _, resp_headers = self._request("PUT", f"/{bucket}/{_quote_path(key)}", data, headers)
         return resp_headers.get("etag", "").strip('"')
 
     def delete_object(self, bucket: str, key: str) -> None:
         """Delete object"""
-        self._request("DELETE", f"/{bucket}/{key}")
+        self._request("DELETE", f"/{bucket}/{_quote_path(key)}")
 
     def object_exists(self, bucket: str, key: str) -> bool:
         """Check if object exists"""
-        try:
-            self._request("HEAD", f"/{bucket}/{key}")
-            return True
-        except StorageError:
-            return False
+        return self._exists(f"/{bucket}/{_quote_path(key)}")
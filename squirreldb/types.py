@@ -4,13 +4,19 @@ Generated by sdk-generator v0.1.0
 DO NOT EDIT MANUALLY
 """
 
+import sys
 from dataclasses import dataclass
 from typing import Any, Optional
 
+# Fields with defaults cannot be listed in a hand-written __slots__, so those
+# dataclasses get generated slots where the interpreter supports it.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class Document:
     """A document stored in SquirrelDB"""
+    __slots__ = ("id", "collection", "data", "created_at", "updated_at")
     id: str
     collection: str
     data: dict[str, Any]
@@ -19,16 +25,30 @@ class Document:
 
     @classmethod
     def from_dict(cls, d: dict) -> "Document":
-        return cls(
-            id=d["id"],
-            collection=d["collection"],
-            data=d["data"],
-            created_at=d["created_at"],
-            updated_at=d["updated_at"],
-        )
+        return cls(d["id"], d["collection"], d["data"], d["created_at"], d["updated_at"])
 
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the wire dict form (data is shared, not deep-copied)"""
+        return {
+            "id": self.id,
+            "collection": self.collection,
+            "data": self.data,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
 
-@dataclass
+    def __reduce__(self):
+        # Pickle as a constructor call over the slot values: smaller than the
+        # generic slots state dict and valid on every pickle protocol.
+        return (type(self), (self.id, self.collection, self.data, self.created_at, self.updated_at))
+
+    @classmethod
+    def from_dict_list(cls, ds: list[dict]) -> list["Document"]:
+        """Build documents for a whole result page in one pass"""
+        return [cls(d["id"], d["collection"], d["data"], d["created_at"], d["updated_at"]) for d in ds]
+
+
+@dataclass(**_SLOTS)
 class ChangeEvent:
     """A change event from a subscription"""
     type: str
@@ -39,15 +59,19 @@ class ChangeEvent:
     @classmethod
     def from_dict(cls, d: dict) -> "ChangeEvent":
         event_type = d["type"]
-        if event_type == "initial":
-            return cls(type=event_type, document=Document.from_dict(d["document"]))
-        elif event_type == "insert":
-            return cls(type=event_type, new=Document.from_dict(d["new"]))
-        elif event_type == "update":
-            return cls(type=event_type, old=d["old"], new=Document.from_dict(d["new"]))
-        elif event_type == "delete":
-            return cls(type=event_type, old=Document.from_dict(d["old"]))
-        return cls(type=event_type)
+        builder = _EVENT_BUILDERS.get(event_type)
+        if builder is None:
+            return cls(type=event_type)
+        return builder(cls, d)
+
+
+# One lookup per event instead of a chain of string compares
+_EVENT_BUILDERS = {
+    "initial": lambda cls, d: cls(type="initial", document=Document.from_dict(d["document"])),
+    "insert": lambda cls, d: cls(type="insert", new=Document.from_dict(d["new"])),
+    "update": lambda cls, d: cls(type="update", old=d["old"], new=Document.from_dict(d["new"])),
+    "delete": lambda cls, d: cls(type="delete", old=Document.from_dict(d["old"])),
+}
 
 
 @dataclass
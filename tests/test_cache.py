@@ -1,7 +1,12 @@
 """Tests for SquirrelDB Python SDK - Cache"""
 
+import asyncio
+
 import pytest
 
+from squirreldb import Cache
+from squirreldb.cache import _DBSIZE, _FLUSHDB, _PING, NEED_MORE, RespParser, encode_resp
+
 
 class TestCacheOptions:
     """Test cache options structure"""
@@ -57,73 +62,262 @@ class TestCacheCommands:
     """Test cache command encoding"""
 
     def encode_command(self, *args):
-        parts = [f"*{len(args)}\r\n"]
-        for arg in args:
-            s = str(arg)
-            parts.append(f"${len(s)}\r\n{s}\r\n")
-        return "".join(parts)
+        return encode_resp(*args)
 
     def test_ping_command(self):
         cmd = self.encode_command("PING")
-        assert cmd == "*1\r\n$4\r\nPING\r\n"
+        assert cmd == b"*1\r\n$4\r\nPING\r\n"
 
     def test_get_command(self):
         cmd = self.encode_command("GET", "mykey")
-        assert cmd == "*2\r\n$3\r\nGET\r\n$5\r\nmykey\r\n"
+        assert cmd == b"*2\r\n$3\r\nGET\r\n$5\r\nmykey\r\n"
 
     def test_set_command(self):
         cmd = self.encode_command("SET", "mykey", "myvalue")
-        assert cmd == "*3\r\n$3\r\nSET\r\n$5\r\nmykey\r\n$7\r\nmyvalue\r\n"
+        assert cmd == b"*3\r\n$3\r\nSET\r\n$5\r\nmykey\r\n$7\r\nmyvalue\r\n"
 
     def test_set_with_ex_command(self):
         cmd = self.encode_command("SET", "mykey", "myvalue", "EX", 60)
-        assert "*5\r\n" in cmd
-        assert "$2\r\nEX\r\n" in cmd
+        assert b"*5\r\n" in cmd
+        assert b"$2\r\nEX\r\n" in cmd
 
     def test_del_command(self):
         cmd = self.encode_command("DEL", "mykey")
-        assert cmd == "*2\r\n$3\r\nDEL\r\n$5\r\nmykey\r\n"
+        assert cmd == b"*2\r\n$3\r\nDEL\r\n$5\r\nmykey\r\n"
 
     def test_exists_command(self):
         cmd = self.encode_command("EXISTS", "mykey")
-        assert "EXISTS" in cmd
+        assert b"EXISTS" in cmd
 
     def test_incr_command(self):
         cmd = self.encode_command("INCR", "counter")
-        assert "INCR" in cmd
+        assert b"INCR" in cmd
 
     def test_incrby_command(self):
         cmd = self.encode_command("INCRBY", "counter", 5)
-        assert "INCRBY" in cmd
-        assert "$1\r\n5\r\n" in cmd
+        assert b"INCRBY" in cmd
+        assert b"$1\r\n5\r\n" in cmd
 
     def test_mget_command(self):
         cmd = self.encode_command("MGET", "key1", "key2", "key3")
-        assert "*4\r\n" in cmd
-        assert "MGET" in cmd
+        assert b"*4\r\n" in cmd
+        assert b"MGET" in cmd
 
     def test_mset_command(self):
         cmd = self.encode_command("MSET", "key1", "val1", "key2", "val2")
-        assert "*5\r\n" in cmd
-        assert "MSET" in cmd
+        assert b"*5\r\n" in cmd
+        assert b"MSET" in cmd
 
     def test_keys_command(self):
         cmd = self.encode_command("KEYS", "user:*")
-        assert "KEYS" in cmd
-        assert "user:*" in cmd
+        assert b"KEYS" in cmd
+        assert b"user:*" in cmd
 
     def test_expire_command(self):
         cmd = self.encode_command("EXPIRE", "mykey", 300)
-        assert "EXPIRE" in cmd
+        assert b"EXPIRE" in cmd
 
     def test_ttl_command(self):
         cmd = self.encode_command("TTL", "mykey")
-        assert "TTL" in cmd
+        assert b"TTL" in cmd
 
     def test_dbsize_command(self):
         cmd = self.encode_command("DBSIZE")
-        assert cmd == "*1\r\n$6\r\nDBSIZE\r\n"
+        assert cmd == b"*1\r\n$6\r\nDBSIZE\r\n"
 
     def test_flushdb_command(self):
         cmd = self.encode_command("FLUSHDB")
-        assert cmd == "*1\r\n$7\r\nFLUSHDB\r\n"
+        assert cmd == b"*1\r\n$7\r\nFLUSHDB\r\n"
+
+
+class TestEncodeResp:
+    """Test the RESP command encoder"""
+
+    def test_encodes_str_int_and_bytes_args(self):
+        assert encode_resp("SET", b"key", 60) == b"*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$2\r\n60\r\n"
+
+    def test_large_lengths_bypass_header_table(self):
+        value = "x" * 2000
+        encoded = encode_resp(*(["MSET"] + [value] * 1100))
+        assert encoded.startswith(b"*1101\r\n$4\r\nMSET\r\n$2000\r\n")
+
+    def test_length_counts_encoded_bytes(self):
+        assert encode_resp("GET", "café") == b"*2\r\n$3\r\nGET\r\n$5\r\ncaf\xc3\xa9\r\n"
+
+    def test_fixed_command_frames(self):
+        assert _PING == b"*1\r\n$4\r\nPING\r\n"
+        assert _DBSIZE == b"*1\r\n$6\r\nDBSIZE\r\n"
+        assert _FLUSHDB == b"*1\r\n$7\r\nFLUSHDB\r\n"
+
+
+class TestRespParser:
+    """Test the incremental RESP reply parser"""
+
+    def test_parses_scalar_replies(self):
+        parser = RespParser()
+        parser.feed(b"+OK\r\n:42\r\n$5\r\nhello\r\n$-1\r\n-ERR bad\r\n")
+        assert parser.parse() == "OK"
+        assert parser.parse() == 42
+        assert parser.parse() == b"hello"
+        assert parser.parse() is None
+        error = parser.parse()
+        assert isinstance(error, Exception)
+        assert str(error) == "ERR bad"
+        assert parser.parse() is NEED_MORE
+
+    def test_parses_nested_arrays(self):
+        parser = RespParser()
+        parser.feed(b"*3\r\n:1\r\n*2\r\n$1\r\na\r\n$-1\r\n*0\r\n*-1\r\n")
+        assert parser.parse() == [1, [b"a", None], []]
+        assert parser.parse() is None
+
+    def test_resumes_across_partial_feeds(self):
+        data = b"*2\r\n$3\r\nfoo\r\n$3\r\nbar\r\n+PONG\r\n"
+        parser = RespParser()
+        replies = []
+        for i in range(len(data)):
+            parser.feed(data[i:i + 1])
+            while (reply := parser.parse()) is not NEED_MORE:
+                replies.append(reply)
+        assert replies == [[b"foo", b"bar"], "PONG"]
+
+
+def _fake_handler(store):
+    """Return a minimal RESP handler that answers pipelined GET/SET/PING."""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                cmd = args[0].upper()
+                if cmd == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif cmd == "SET":
+                    store[args[1]] = args[2]
+                    writer.write(b"+OK\r\n")
+                elif cmd == "GET":
+                    value = store.get(args[1])
+                    if value is None:
+                        writer.write(b"$-1\r\n")
+                    else:
+                        data = value.encode()
+                        writer.write(b"$%d\r\n%s\r\n" % (len(data), data))
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return handle
+
+
+@pytest.fixture
+async def connect_cache():
+    """Connect Caches to local servers, closing both on teardown."""
+    servers, caches = [], []
+
+    async def connect(store=None, decode_responses=True, handle=None):
+        server = await asyncio.start_server(
+            handle or _fake_handler({} if store is None else store), "127.0.0.1", 0
+        )
+        servers.append(server)
+        port = server.sockets[0].getsockname()[1]
+        cache = await Cache.connect("127.0.0.1", port, decode_responses)
+        caches.append(cache)
+        return cache
+
+    yield connect
+    for cache in caches:
+        await cache.close()
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+class TestCachePipelining:
+    """Test concurrent commands sharing one connection"""
+
+    async def test_concurrent_commands_resolve_in_order(self, connect_cache):
+        cache = await connect_cache({"a": "1", "b": "2"})
+        results = await asyncio.gather(
+            cache.get("a"), cache.ping(), cache.get("b"), cache.get("missing")
+        )
+        assert results == ["1", "PONG", "2", None]
+
+    async def test_error_reply_only_fails_its_command(self, connect_cache):
+        cache = await connect_cache({"a": "1"})
+        results = await asyncio.gather(
+            cache.dbsize(), cache.get("a"), return_exceptions=True
+        )
+        assert isinstance(results[0], Exception)
+        assert results[1] == "1"
+
+    async def test_pipeline_returns_replies_in_order(self, connect_cache):
+        cache = await connect_cache(decode_responses=False)
+        results = await cache.pipeline([("SET", "a", "1"), ("GET", "a"), ("PING",)])
+        assert results == ["OK", b"1", "PONG"]
+
+    async def test_pipeline_decodes_replies_by_default(self, connect_cache):
+        cache = await connect_cache({"a": "1"})
+        results = await cache.pipeline([("GET", "a"), ("GET", "missing"), ("PING",)])
+        assert results == ["1", None, "PONG"]
+        assert results[0] == await cache.get("a")
+
+    async def test_pipeline_raises_error_reply(self, connect_cache):
+        cache = await connect_cache()
+        with pytest.raises(Exception, match="unknown command"):
+            await cache.pipeline([("PING",), ("DBSIZE",)])
+
+    async def test_large_write_past_high_water_mark(self, connect_cache):
+        cache = await connect_cache()
+        value = "x" * (cache._write_high_water * 4)
+        await cache.set("big", value)
+        assert await cache.get("big") == value
+
+    async def test_raw_bulk_replies_without_decoding(self, connect_cache):
+        cache = await connect_cache({"a": "1"}, decode_responses=False)
+        assert await cache.get("a") == b"1"
+        assert await cache.ping() == "PONG"
+
+    async def test_pending_commands_fail_when_closed(self, connect_cache):
+        cache = await connect_cache()
+        await cache.close()
+        with pytest.raises(ConnectionError):
+            await cache.get("a")
+
+    async def test_in_flight_commands_fail_when_closed(self, connect_cache):
+        async def handle(reader, writer):
+            await reader.read()  # never replies
+            writer.close()
+
+        cache = await connect_cache(handle=handle)
+        in_flight = asyncio.ensure_future(cache.get("a"))
+        while not cache._pending:
+            await asyncio.sleep(0)
+        await cache.close()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(in_flight, 1)
+
+    async def test_close_waits_for_reader_task(self, connect_cache):
+        cache = await connect_cache()
+        await cache.close()
+        assert cache._reader_task.done()
+
+    async def test_failed_send_leaves_no_pending_future(self, connect_cache):
+        def broken_write(data):
+            raise ConnectionResetError("reset")
+
+        cache = await connect_cache()
+        cache._writer.write = cache._writer.writelines = broken_write
+        with pytest.raises(ConnectionResetError):
+            await cache.get("a")
+        with pytest.raises(ConnectionResetError):
+            await cache.pipeline([("PING",), ("PING",)])
+        assert len(cache._pending) == 3
+        assert all(future.cancelled() for future in cache._pending)
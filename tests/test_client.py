@@ -1,7 +1,39 @@
 """Tests for SquirrelDB Python client - mock-based unit tests"""
 
+import asyncio
+import dataclasses
+import json
+import pickle
+
 import pytest
-from squirreldb import Document, ChangeEvent
+from squirreldb import Document, ChangeEvent, SquirrelDB
+
+
+class FakeWebSocket:
+    """Records frames sent by the client"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def _fake_client():
+    """Create a client wired to a FakeWebSocket on the running loop"""
+    client = SquirrelDB("localhost:8080")
+    client._ws = FakeWebSocket()
+    client._loop = asyncio.get_running_loop()
+    return client, client._ws
+
+
+async def _reply(client, ws, response):
+    """Wait for the next request frame and answer it"""
+    while not ws.sent:
+        await asyncio.sleep(0)
+    request = json.loads(ws.sent.pop())
+    client._handle_message({**response, "id": request["id"]})
+    return request
 
 
 class TestDocument:
@@ -38,6 +70,35 @@ class TestDocument:
         assert isinstance(doc.created_at, str)
         assert isinstance(doc.updated_at, str)
 
+    def test_document_from_dict_list(self):
+        rows = [
+            {"id": str(i), "collection": "users", "data": {"n": i},
+             "created_at": "t0", "updated_at": "t1"}
+            for i in range(3)
+        ]
+        docs = Document.from_dict_list(rows)
+
+        assert docs == [Document.from_dict(row) for row in rows]
+        assert Document.from_dict_list([]) == []
+
+    def test_document_to_dict_round_trip(self):
+        doc = Document("1", "users", {"name": "Test"}, "t0", "t1")
+
+        assert doc.to_dict() == dataclasses.asdict(doc)
+        assert Document.from_dict(doc.to_dict()) == doc
+
+    def test_document_pickle_round_trip(self):
+        doc = Document("1", "users", {"name": "Test"}, "t0", "t1")
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            assert pickle.loads(pickle.dumps(doc, protocol=protocol)) == doc
+
+    def test_document_has_no_instance_dict(self):
+        doc = Document("1", "users", {}, "t0", "t1")
+        assert not hasattr(doc, "__dict__")
+        with pytest.raises(AttributeError):
+            doc.extra = True
+
 
 class TestChangeEvent:
     """Test ChangeEvent type"""
@@ -109,6 +170,12 @@ class TestChangeEvent:
         assert event.type == "delete"
         assert event.old is not None
 
+    def test_change_event_unknown_type(self):
+        event = ChangeEvent.from_dict({"type": "truncate"})
+
+        assert event.type == "truncate"
+        assert event.document is None and event.new is None and event.old is None
+
 
 class TestMessageProtocol:
     """Test message protocol structures"""
@@ -237,3 +304,80 @@ class TestServerResponseProtocol:
         }
         assert response["type"] == "Change"
         assert response["change"]["type"] == "insert"
+
+
+class TestRequestFrames:
+    """Test frames sent by the client"""
+
+    async def test_insert_frame(self):
+        client, ws = _fake_client()
+        doc = {"id": "1", "collection": "users", "data": {}, "created_at": "", "updated_at": ""}
+        task = asyncio.create_task(client.insert("users", {"name": "Alice"}))
+        request = await _reply(client, ws, {"type": "Result", "documents": [doc]})
+        assert (await task).id == "1"
+        assert request["type"] == "Insert"
+        assert request["collection"] == "users"
+        assert request["data"] == {"name": "Alice"}
+
+    async def test_frame_without_fields(self):
+        client, ws = _fake_client()
+        task = asyncio.create_task(client.list_collections())
+        request = await _reply(client, ws, {"type": "Collections", "collections": ["users"]})
+        assert await task == ["users"]
+        assert set(request) == {"type", "id"}
+        assert request["type"] == "ListCollections"
+
+    async def test_request_ids_are_unique_per_connection(self):
+        client, ws = _fake_client()
+        first = asyncio.create_task(client.query("q1"))
+        second = asyncio.create_task(client.query("q2"))
+        while len(ws.sent) < 2:
+            await asyncio.sleep(0)
+        ids = [json.loads(m)["id"] for m in ws.sent]
+        assert ids == ["1", "2"]
+        for msg_id in ids:
+            client._handle_message({"type": "Result", "id": msg_id, "documents": []})
+        assert await first == [] and await second == []
+
+    async def test_ping_frame(self):
+        client, ws = _fake_client()
+        await client.ping()
+        assert json.loads(ws.sent[0]) == {"type": "Ping"}
+
+
+class TestMessageDispatch:
+    """Test dispatch of server messages"""
+
+    async def test_change_invokes_subscription_callback(self):
+        client = SquirrelDB("localhost:8080")
+        events = []
+        client._subscriptions["sub-1"] = events.append
+        client._handle_message({
+            "type": "Change",
+            "subscription_id": "sub-1",
+            "change": {"type": "delete", "old": {
+                "id": "1", "collection": "users", "data": {}, "created_at": "", "updated_at": "",
+            }},
+        })
+        client._handle_message({"type": "Change", "subscription_id": "other", "change": {}})
+        assert len(events) == 1
+        assert events[0].type == "delete"
+
+    async def test_error_rejects_pending_request(self):
+        client = SquirrelDB("localhost:8080")
+        future = asyncio.get_running_loop().create_future()
+        client._pending["7"] = future
+        client._handle_message({"type": "Error", "id": "7", "message": "bad query"})
+        with pytest.raises(Exception, match="bad query"):
+            await future
+        assert "7" not in client._pending
+
+    async def test_disconnect_rejects_pending_requests(self):
+        client = SquirrelDB("localhost:8080")
+        futures = [asyncio.get_running_loop().create_future() for _ in range(3)]
+        client._pending = {str(i): f for i, f in enumerate(futures)}
+        client._handle_disconnect()
+        assert client._pending == {}
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                await future
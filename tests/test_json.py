@@ -0,0 +1,61 @@
+"""Tests for SquirrelDB Python SDK - JSON codec"""
+
+import json
+import math
+
+import pytest
+
+from squirreldb import _json, use_orjson
+from squirreldb.query import field_expr as field, table
+
+
+@pytest.fixture
+def orjson_backend():
+    pytest.importorskip("orjson")
+    use_orjson()
+    yield
+    use_orjson(False)
+
+
+class TestStdlibBackend:
+    """Test the default codec"""
+
+    def test_orjson_is_opt_in(self):
+        assert not _json.orjson_enabled()
+
+    def test_round_trips_values_orjson_cannot(self):
+        value = {"big": 2**70, "nan": float("nan"), "inf": float("inf")}
+        decoded = _json.loads(_json.dumps(value))
+        assert decoded["big"] == 2**70
+        assert math.isnan(decoded["nan"])
+        assert decoded["inf"] == float("inf")
+
+    def test_compact_output(self):
+        assert _json.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+
+
+class TestOrjsonBackend:
+    """Test the opt-in orjson codec"""
+
+    def test_matches_stdlib_for_plain_values(self, orjson_backend):
+        value = {"a": [1, 2.5, None, True], "b": "é", 3: "int key"}
+        assert json.loads(_json.dumps(value)) == json.loads(json.dumps(value))
+
+    def test_falls_back_to_stdlib_for_big_ints(self, orjson_backend):
+        assert _json.dumps({"n": 2**70}) == '{"n":%d}' % 2**70
+        compiled = table("t").find(field("n").eq(2**70)).compile()
+        assert json.loads(compiled)["filter"] == {"n": {"$eq": 2**70}}
+
+    def test_documented_differences(self, orjson_backend):
+        assert _json.dumps(float("nan")) == "null"
+        assert isinstance(_json.loads(str(2**70)), float)
+
+    def test_can_be_disabled(self, orjson_backend):
+        use_orjson(False)
+        assert _json.dumps(float("nan")) == "NaN"
+
+    def test_query_builder_follows_toggle(self, orjson_backend):
+        query = table("t").find(field("x").eq(float("nan")))
+        assert json.loads(query.compile())["filter"] == {"x": {"$eq": None}}
+        use_orjson(False)
+        assert '"$eq":NaN' in table("t").find(field("x").eq(float("nan"))).compile()
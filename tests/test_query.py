@@ -76,6 +76,14 @@ class TestFieldExpr:
         assert cond.operator == "$exists"
         assert cond.value == True
 
+    def test_operators_share_one_string(self):
+        assert field("a").gte(1).operator is field("b").gte(2).operator
+
+    def test_conditions_have_no_instance_dict(self):
+        cond = field("age").eq(25)
+        assert not hasattr(cond, "__dict__")
+        assert not hasattr(field("age"), "__dict__")
+
     def test_exists_false_creates_non_existence_condition(self):
         cond = field("deleted_at").exists(False)
         assert cond.operator == "$exists"
@@ -106,6 +114,7 @@ class TestQueryBuilder:
             .compile_structured()
         )
         assert result["filter"] == {"age": {"$gte": 18, "$lte": 65}}
+        assert type(result["filter"]) is dict
 
     def test_sort_adds_sort_specification(self):
         result = table("users").sort("name").compile_structured()
@@ -161,6 +170,87 @@ class TestQueryBuilder:
             "skip": 100,
         }
 
+    def test_compile_reflects_later_changes(self):
+        import json
+
+        query = table("users").limit(10)
+        assert query.compile() is query.compile()
+        query.find(field("age").gt(21)).skip(5)
+        assert json.loads(query.compile()) == {
+            "table": "users",
+            "filter": {"age": {"$gt": 21}},
+            "limit": 10,
+            "skip": 5,
+        }
+
+    def test_compiled_filter_is_independent_of_builder(self):
+        query = table("users").find(field("age").gte(18))
+        first = query.compile_structured()
+        first["filter"]["age"]["$lte"] = 65
+        assert query.compile_structured()["filter"] == {"age": {"$gte": 18}}
+
+    def test_compiled_logical_filter_is_independent_of_builder(self):
+        import json
+
+        query = table("users").find(
+            and_(field("age").gte(18), not_(field("banned").eq(True)))
+        )
+        compiled = query.compile()
+        first = query.compile_structured()
+        first["filter"]["$and"].append({"extra": {"$eq": 1}})
+        first["filter"]["$and"][1]["$not"]["banned"]["$eq"] = False
+        second = query.compile_structured()
+        assert second["filter"] == {
+            "$and": [{"age": {"$gte": 18}}, {"$not": {"banned": {"$eq": True}}}]
+        }
+        assert json.loads(compiled) == second
+
+    def test_compiled_operands_and_changes_are_independent_of_builder(self):
+        import json
+
+        query = (
+            table("users")
+            .find(field("id").is_in([1, 2]))
+            .find(or_(field("tag").not_in(["a"])))
+            .changes({"include_initial": False})
+        )
+        first = query.compile_structured()
+        first["filter"]["id"]["$in"].append(3)
+        first["filter"]["$or"][0]["tag"]["$nin"].append("b")
+        first["changes"]["include_initial"] = True
+        query.limit(5)  # drop the cached JSON so compile() re-encodes
+        assert json.loads(query.compile()) == query.compile_structured()
+        assert query.compile_structured()["filter"] == {
+            "id": {"$in": [1, 2]},
+            "$or": [{"tag": {"$nin": ["a"]}}],
+        }
+        assert query.compile_structured()["changes"] == {"include_initial": False}
+
+    def test_scalar_only_queries_compile_without_encoder(self):
+        import json
+
+        for query in (
+            table("users"),
+            table('we"ird').limit(10),
+            table("users").limit(10).skip(5),
+            table("users").skip(2.5),
+        ):
+            compiled = query._compile_scalars()
+            assert json.loads(compiled) == query.compile_structured()
+            assert " " not in compiled
+
+    def test_compile_unaffected_by_mutating_arguments(self):
+        import json
+
+        ids = [1]
+        options = {"include_initial": False}
+        query = table("users").find(field("id").is_in(ids)).changes(options)
+        compiled = query.compile()
+        ids.append(2)
+        options["include_initial"] = True
+        assert query.compile() == compiled
+        assert json.loads(compiled) == query.compile_structured()
+
     def test_compile_returns_json_string(self):
         import json
 
@@ -188,3 +278,51 @@ class TestLogicalOperators:
         cond = not_(field("banned").eq(True))
         assert cond.field == "$not"
         assert cond.operator == "$not"
+
+    def test_logical_operators_compile_to_nested_filters(self):
+        result = table("users").find(
+            and_(
+                field("age").gte(18),
+                or_(field("role").eq("admin"), not_(field("banned").eq(True))),
+            )
+        ).compile_structured()
+        assert result["filter"] == {
+            "$and": [
+                {"age": {"$gte": 18}},
+                {"$or": [
+                    {"role": {"$eq": "admin"}},
+                    {"$not": {"banned": {"$eq": True}}},
+                ]},
+            ]
+        }
+
+    def test_logical_operators_compile_to_json(self):
+        import json
+
+        result = table("users").find(or_(field("a").eq(1), field("b").eq(2))).compile()
+        assert json.loads(result)["filter"] == {"$or": [{"a": {"$eq": 1}}, {"b": {"$eq": 2}}]}
+
+    def test_find_callback_reuses_field_expressions(self):
+        seen = []
+
+        def build(doc):
+            seen.append(doc.age)
+            return doc.age.gte(18)
+
+        first = table("users").find(build).compile_structured()
+        second = table("users").find(build).compile_structured()
+        assert first == second == {"table": "users", "filter": {"age": {"$gte": 18}}}
+        assert seen[0] is seen[1]
+
+    def test_find_callbacks_get_separate_proxies(self):
+        docs = []
+
+        def build(doc):
+            docs.append(doc)
+            doc.marker = len(docs)
+            return doc.age.gte(18)
+
+        table("users").find(build)
+        table("users").find(build)
+        assert docs[0] is not docs[1]
+        assert (docs[0].marker, docs[1].marker) == (1, 2)
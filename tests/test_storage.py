@@ -1,9 +1,131 @@
 """Tests for SquirrelDB Python SDK - Storage"""
 
+import io
 import pytest
 import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
 from urllib.parse import urlencode
 
+from squirreldb.storage import Storage, StorageError, _ObjectListParser, _quote_path
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if not size:
+                    return b"".join(chunks)
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_PUT(self):
+        self.server.requests.append(("PUT", self.path, self.headers, self._read_body()))
+        self._reply(200, headers={"ETag": '"etag-1"'})
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, self.headers, b""))
+        self.server.clients.add(self.client_address)
+        if self.path.startswith("/missing"):
+            self._reply(404, b"NoSuchKey")
+        elif self.path == "/":
+            self._reply(200, (
+                b"<ListAllMyBucketsResult><Buckets>"
+                b"<Bucket><Name>alpha</Name></Bucket><Bucket><Name>b\xc3\xa9ta</Name></Bucket>"
+                b"</Buckets></ListAllMyBucketsResult>"
+            ))
+        elif "?" in self.path:
+            self._reply(200, b"<ListBucketResult><Name>bucket</Name></ListBucketResult>")
+        else:
+            self._reply(200, b"content")
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", self.path, self.headers, b""))
+        self.send_response(404 if self.path.startswith("/missing") else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class _IdleTimeoutHandler(_RecordingHandler):
+    # Drops keep-alive connections that stay idle, like S3 and most proxies
+    timeout = 0.2
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.requests = []
+    server.clients = set()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def s3_server():
+    yield from _serve(_RecordingHandler)
+
+
+@pytest.fixture
+def idle_timeout_server():
+    yield from _serve(_IdleTimeoutHandler)
+
+
+@pytest.fixture
+def make_storage():
+    clients = []
+
+    def make(*args, **kwargs):
+        client = Storage(*args, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def storage(s3_server, make_storage):
+    return make_storage(f"http://127.0.0.1:{s3_server.server_port}")
+
+
+@pytest.fixture
+def idle_storage(idle_timeout_server, make_storage):
+    return make_storage(f"http://127.0.0.1:{idle_timeout_server.server_port}")
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        return self._stream.readinto(buf)
+
 
 class TestStorageOptions:
     """Test storage options structure"""
@@ -136,6 +258,38 @@ class TestS3XMLResponseParsing:
         assert etag_match.group(1).replace('"', "") == "abc123"
 
 
+class TestObjectListParser:
+    """Test streaming ListObjects parsing"""
+
+    def test_parses_contents_entries(self):
+        xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">
+            <Name>my-bucket</Name>
+            <Contents>
+                <Key>logs/a.txt</Key>
+                <LastModified>2024-01-01T00:00:00.000Z</LastModified>
+                <ETag>&quot;abc123&quot;</ETag>
+                <Size>1024</Size>
+                <Owner><ID>owner</ID></Owner>
+            </Contents>
+            <Contents>
+                <Key>logs/b &amp; c.txt</Key>
+                <Size>0</Size>
+                <ETag>"def456"</ETag>
+            </Contents>
+        </ListBucketResult>"""
+        objects = _ObjectListParser().parse(io.BytesIO(xml))
+        assert [(o.key, o.size, o.etag) for o in objects] == [
+            ("logs/a.txt", 1024, "abc123"),
+            ("logs/b & c.txt", 0, "def456"),
+        ]
+        assert objects[0].last_modified == "2024-01-01T00:00:00.000Z"
+
+    def test_empty_listing(self):
+        xml = b"<ListBucketResult><Name>empty</Name></ListBucketResult>"
+        assert _ObjectListParser().parse(io.BytesIO(xml)) == []
+
+
 class TestContentTypes:
     """Test content type mappings"""
 
@@ -152,3 +306,130 @@ class TestContentTypes:
         }
         assert content_types[".json"] == "application/json"
         assert content_types[".png"] == "image/png"
+
+
+class TestQuotePath:
+    """Test request path escaping"""
+
+    def test_safe_key_unchanged(self):
+        key = "photos/2024/IMG_0001.jpg"
+        assert _quote_path(key) is key
+
+    def test_unsafe_characters_escaped(self):
+        assert _quote_path("my file #1.txt") == "my%20file%20%231.txt"
+        assert _quote_path("dir/naïve") == "dir/na%C3%AFve"
+
+
+class TestStorageClient:
+    """Test Storage against a local HTTP server"""
+
+    def test_put_object_bytes(self, storage, s3_server):
+        etag = storage.put_object("bucket", "a.txt", b"hello", "text/plain")
+        assert etag == "etag-1"
+        method, path, headers, body = s3_server.requests[-1]
+        assert (method, path, body) == ("PUT", "/bucket/a.txt", b"hello")
+        assert headers["content-type"] == "text/plain"
+
+    def test_put_object_streams_file_from_current_position(self, storage, s3_server):
+        stream = io.BytesIO(b"skip:payload")
+        stream.seek(5)
+        storage.put_object("bucket", "b.bin", stream)
+        _, _, headers, body = s3_server.requests[-1]
+        assert body == b"payload"
+        assert headers["Content-Length"] == "7"
+
+    def test_get_object_and_errors(self, storage):
+        assert storage.get_object("bucket", "a.txt") == b"content"
+        with pytest.raises(StorageError) as exc:
+            storage.get_object("missing", "a.txt")
+        assert exc.value.status == 404
+        assert storage.object_exists("bucket", "a.txt")
+        assert not storage.object_exists("missing", "a.txt")
+
+    def test_reuses_connections_between_requests(self, storage, s3_server):
+        for _ in range(3):
+            assert storage.get_object("bucket", "a.txt") == b"content"
+        with pytest.raises(StorageError):
+            storage.get_object("missing", "a.txt")
+        assert storage.get_object("bucket", "a.txt") == b"content"
+        assert len(s3_server.clients) == 1
+
+    def test_recovers_from_dropped_idle_connection(self, storage):
+        assert storage.get_object("bucket", "a.txt") == b"content"
+        storage._idle[0].sock.close()
+        assert storage.get_object("bucket", "a.txt") == b"content"
+
+    def test_sends_access_key_with_and_without_request_headers(self, make_storage, s3_server):
+        storage = make_storage(f"http://127.0.0.1:{s3_server.server_port}", access_key="AK")
+        storage.get_object("bucket", "a.txt")
+        storage.put_object("bucket", "a.txt", b"x", "text/plain")
+        get_headers, put_headers = s3_server.requests[-2][2], s3_server.requests[-1][2]
+        assert get_headers["x-amz-access-key-id"] == "AK"
+        assert put_headers["x-amz-access-key-id"] == "AK"
+        assert put_headers["content-type"] == "text/plain"
+        assert storage._default_headers == {"x-amz-access-key-id": "AK"}
+
+    def test_escapes_object_keys(self, storage, s3_server):
+        storage.get_object("bucket", "my file.txt")
+        assert s3_server.requests[-1][1] == "/bucket/my%20file.txt"
+
+    def test_exists_checks_reuse_connection(self, storage):
+        assert storage.bucket_exists("bucket")
+        assert not storage.bucket_exists("missing")
+        assert not storage.object_exists("missing", "a.txt")
+        assert len(storage._idle) == 1
+
+    def test_list_buckets(self, storage):
+        assert [b.name for b in storage.list_buckets()] == ["alpha", "béta"]
+
+    def test_list_objects_encodes_query(self, storage, s3_server):
+        assert storage.list_objects("bucket", prefix="my dir/&x", max_keys=10) == []
+        assert s3_server.requests[-1][1] == "/bucket?prefix=my%20dir%2F%26x&max-keys=10"
+
+    def test_unreachable_endpoint_raises_url_error(self, make_storage):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        storage = make_storage(f"http://127.0.0.1:{port}")
+        with pytest.raises(URLError):
+            storage.get_object("bucket", "a.txt")
+
+    def test_sends_requests_through_http_proxy(self, make_storage, s3_server, monkeypatch):
+        monkeypatch.setenv("http_proxy", f"http://user:pw@127.0.0.1:{s3_server.server_port}")
+        monkeypatch.delenv("no_proxy", raising=False)
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        storage = make_storage("http://s3.example.test:9000/base")
+        assert storage.get_object("bucket", "a.txt") == b"content"
+        _, path, headers, _ = s3_server.requests[-1]
+        assert path == "http://s3.example.test:9000/base/bucket/a.txt"
+        assert headers["Proxy-Authorization"] == "Basic dXNlcjpwdw=="
+
+    def test_threads_share_connection_pool(self, make_storage, s3_server):
+        storage = make_storage(f"http://127.0.0.1:{s3_server.server_port}", max_conns=4)
+
+        def fetch(_):
+            return storage.get_object("bucket", "a.txt")
+
+        with ThreadPoolExecutor(8) as pool:
+            assert set(pool.map(fetch, range(200))) == {b"content"}
+        assert len(storage._idle) <= 4
+
+
+class TestStorageIdleConnections:
+    """Test uploads over keep-alive connections the server has closed"""
+
+    def test_retries_stream_upload_from_original_position(
+        self, idle_storage, idle_timeout_server
+    ):
+        idle_storage.put_object("bucket", "a.txt", b"hello")
+        time.sleep(0.4)
+        stream = io.BytesIO(b"skip:payload")
+        stream.seek(5)
+        assert idle_storage.put_object("bucket", "b.bin", stream) == "etag-1"
+        assert idle_timeout_server.requests[-1][3] == b"payload"
+
+    def test_unseekable_stream_uses_fresh_connection(self, idle_storage, idle_timeout_server):
+        idle_storage.put_object("bucket", "a.txt", b"hello")
+        time.sleep(0.4)
+        assert idle_storage.put_object("bucket", "b.bin", _Unseekable(b"payload")) == "etag-1"
+        assert idle_timeout_server.requests[-1][3] == b"payload"